@@ -267,13 +267,10 @@ class EventFileLoader(LegacyEventFileLoader):
         self._initial_metadata = {}  # from tag name to `SummaryMetadata`
 
     def Load(self):
-        for event in super().Load():
-            event = data_compat.migrate_event(event)
-            events = dataclass_compat.migrate_event(
-                event, self._initial_metadata
-            )
-            for event in events:
-                yield event
+        events = (data_compat.migrate_event(e) for e in super().Load())
+        yield from dataclass_compat.migrate_events(
+            events, self._initial_metadata
+        )
 
 
 class TimestampedEventFileLoader(EventFileLoader):
@@ -14,9 +14,18 @@
 # ==============================================================================
 
 
+import collections
+from concurrent import futures
+import functools
 import os
+import shutil
+import struct
+import tempfile
+import time
+import types
 from unittest import mock
 
+from google.protobuf.internal import api_implementation
 import numpy as np
 import tensorflow as tf
 
@@ -41,6 +50,152 @@ from tensorboard.util import test_util
 
 logger = tb_logging.get_logger()
 
+# These tests round-trip graph and meta graph protos many times. Both the
+# C++ and upb backends are selected by default when installed, so there is
+# nothing to force here, but make a slow pure-Python fallback visible.
+if api_implementation.Type() == "python":
+    logger.warning(
+        "Using the pure-Python protobuf implementation; "
+        "these tests will be much slower than with the C++ or upb backend."
+    )
+
+# Default (empty) value of every tag type in a `Tags()` response.
+_EMPTY_TAGS = types.MappingProxyType(
+    {
+        ea.GRAPH: False,
+        ea.META_GRAPH: False,
+        ea.RUN_METADATA: (),
+        ea.TENSORS: (),
+    }
+)
+_EMPTY_TAGS_KEYS = frozenset(_EMPTY_TAGS)
+
+# Invariant tensor written by `_build_summary_bytes`; do not mutate.
+_POTATO_TENSOR_PROTO = tensor_util.make_tensor_proto(
+    ["po", "ta", "to"], dtype=tf.string
+)
+
+
+def _scalar_tensor_proto(value):
+    """Returns a shared `TensorProto` for a float scalar; do not mutate."""
+    # Key the cache on the exact bits: `0.0 == -0.0` with equal hashes, so
+    # keying on the float itself would hand one out for the other.
+    return _scalar_tensor_proto_for_bits(struct.pack("<d", value))
+
+
+@functools.lru_cache(maxsize=1024)
+def _scalar_tensor_proto_for_bits(bits):
+    (value,) = struct.unpack("<d", bits)
+    return tensor_util.make_tensor_proto(value)
+
+
+def _zero_wall_time():
+    """Makes `FileWriter` stamp the events it writes with a wall time of 0.
+
+    This patches the process-wide `time.time`, so wrap only the writer
+    calls with it, not graph construction or `Session.run`.
+    """
+    return mock.patch.object(time, "time", return_value=0.0)
+
+
+def _steps(events):
+    """Returns the steps of the given events as an int64 array."""
+    return np.fromiter(
+        (e.step for e in events), dtype=np.int64, count=len(events)
+    )
+
+
+def _float_scalars(events):
+    """Returns the values of the given float32 scalar tensor events."""
+
+    def value(tensor_proto):
+        if tensor_proto.float_val:
+            return tensor_proto.float_val[0]
+        return np.frombuffer(tensor_proto.tensor_content, dtype=np.float32)[0]
+
+    return np.fromiter(
+        (value(e.tensor_proto) for e in events),
+        dtype=np.float32,
+        count=len(events),
+    )
+
+
+def _build_summary_bytes(tag, summary_metadata):
+    """Returns a serialized one-value `Summary` with a string tensor.
+
+    Shared by `_write_metadata` and `_write_metadata_batch`.
+    """
+    summary = summary_pb2.Summary()
+    value = summary.value.add()
+    value.tag = tag
+    value.metadata.CopyFrom(summary_metadata)
+    value.tensor.CopyFrom(_POTATO_TENSOR_PROTO)
+    return summary.SerializeToString()
+
+
+def _make_summary_metadata(
+    display_name, summary_description, plugin_name, content=b""
+):
+    """Returns a `SummaryMetadata` for a single plugin."""
+    return summary_pb2.SummaryMetadata(
+        display_name=display_name,
+        summary_description=summary_description,
+        plugin_data=summary_pb2.SummaryMetadata.PluginData(
+            plugin_name=plugin_name, content=content
+        ),
+    )
+
+
+def _write_metadata(logdir, summary_metadata, nonce=""):
+    """Write to disk a summary with the given metadata.
+
+    Arguments:
+      logdir: a string
+      summary_metadata: a `SummaryMetadata` protobuf object
+      nonce: optional; will be added to the end of the event file name
+        to guarantee that multiple calls to this function do not stomp the
+        same file
+    """
+    summary_bytes = _build_summary_bytes("you_are_it", summary_metadata)
+    writer = test_util.FileWriter(logdir, filename_suffix=nonce)
+    writer.add_summary(summary_bytes)
+    writer.close()
+
+
+def _write_metadata_batch(logdir, metadata_and_nonces):
+    """Like `_write_metadata`, for several event files at once.
+
+    Every writer is opened and fed before any is closed, and the closes
+    (with their flushes) then run concurrently.
+
+    Event file names look like `events.out.tfevents.<seconds>.<host><nonce>`
+    and are fixed when each writer is created. Writers are created in list
+    order, so the seconds never decrease, but files created within the
+    same second sort by nonce alone. The nonces must therefore already be
+    in sorted order for the files to load in list order.
+
+    Arguments:
+      logdir: a string
+      metadata_and_nonces: a list of `(summary_metadata, nonce)` pairs, one
+        per event file to write, with nonces in sorted order
+
+    Raises:
+      ValueError: If the nonces are not in sorted order.
+    """
+    nonces = [nonce for (_, nonce) in metadata_and_nonces]
+    if nonces != sorted(nonces):
+        raise ValueError("nonces must be in sorted order: %r" % (nonces,))
+    writers = []
+    for summary_metadata, nonce in metadata_and_nonces:
+        writer = test_util.FileWriter(logdir, filename_suffix=nonce)
+        writer.add_summary(_build_summary_bytes("you_are_it", summary_metadata))
+        writers.append(writer)
+    with futures.ThreadPoolExecutor(
+        max_workers=max(1, len(writers))
+    ) as executor:
+        # Consume the results so that any exception from `close` propagates.
+        list(executor.map(test_util.FileWriter.close, writers))
+
 
 class _EventGenerator:
     """Class that can add_events and then yield them back.
@@ -51,21 +206,20 @@ class _EventGenerator:
     Has additional convenience methods for adding test events.
     """
 
-    def __init__(self, testcase, zero_out_timestamps=False):
+    def __init__(self, testcase):
         self._testcase = testcase
-        self.items = []
-        self.zero_out_timestamps = zero_out_timestamps
+        self.items = collections.deque()
         self._initial_metadata = {}
 
     def Load(self):
+        events = (data_compat.migrate_event(e) for e in self._Drain())
+        yield from dataclass_compat.migrate_events(
+            events, self._initial_metadata
+        )
+
+    def _Drain(self):
         while self.items:
-            event = self.items.pop(0)
-            event = data_compat.migrate_event(event)
-            events = dataclass_compat.migrate_event(
-                event, self._initial_metadata
-            )
-            for event in events:
-                yield event
+            yield self.items.popleft()
 
     def AddScalarTensor(self, tag, wall_time=0, step=0, value=0):
         """Add a rank-0 tensor event.
@@ -74,7 +228,9 @@ class _EventGenerator:
         convenience function to add an event whose contents aren't
         important.
         """
-        tensor = tensor_util.make_tensor_proto(float(value))
+        # `Summary.Value` copies the tensor, so the cached proto is safe to
+        # share across events.
+        tensor = _scalar_tensor_proto(float(value))
         event = event_pb2.Event(
             wall_time=wall_time,
             step=step,
@@ -85,9 +241,15 @@ class _EventGenerator:
         self.AddEvent(event)
 
     def AddEvent(self, event):
-        event = event_pb2.Event.FromString(event.SerializeToString())
-        if self.zero_out_timestamps:
-            event.wall_time = 0.0
+        """Add an event, taking ownership of it.
+
+        Callers should pass a freshly constructed proto, since later
+        changes to it would be seen by the accumulator.
+        """
+        if not isinstance(event, event_pb2.Event):
+            # Events from `test_util.FileWriter` use TensorFlow's copy of
+            # the `Event` proto, so convert them to TensorBoard's.
+            event = event_pb2.Event.FromString(event.SerializeToString())
         self.items.append(event)
 
     def add_event(self, event):  # pylint: disable=invalid-name
@@ -100,6 +262,22 @@ class _EventGenerator:
 
 
 class EventAccumulatorTest(tf.test.TestCase):
+    @classmethod
+    def _make_class_temp_dir(cls):
+        """Creates `cls._class_temp_dir` for use across the whole class.
+
+        Pair with `_remove_class_temp_dir` in `tearDownClass`, and also
+        call that if the rest of `setUpClass` fails, since `tearDownClass`
+        is then skipped.
+        """
+        cls._class_temp_dir = tempfile.mkdtemp(
+            dir=tf.compat.v1.test.get_temp_dir()
+        )
+
+    @classmethod
+    def _remove_class_temp_dir(cls):
+        shutil.rmtree(cls._class_temp_dir, ignore_errors=True)
+
     def assertTagsEqual(self, actual, expected):
         """Utility method for checking the return value of the Tags() call.
 
@@ -112,40 +290,57 @@ class EventAccumulatorTest(tf.test.TestCase):
           expected: The expected tags response (empty fields may be omitted)
         """
 
-        empty_tags = {
-            ea.GRAPH: False,
-            ea.META_GRAPH: False,
-            ea.RUN_METADATA: [],
-            ea.TENSORS: [],
-        }
-
         # Verifies that there are no unexpected keys in the actual response.
         # If this line fails, likely you added a new tag type, and need to update
-        # the empty_tags dictionary above.
-        self.assertItemsEqual(actual.keys(), empty_tags.keys())
+        # the _EMPTY_TAGS dictionary above.
+        self.assertEqual(frozenset(actual), _EMPTY_TAGS_KEYS)
 
         for key in actual:
-            expected_value = expected.get(key, empty_tags[key])
-            if isinstance(expected_value, list):
+            expected_value = expected.get(key, _EMPTY_TAGS[key])
+            if isinstance(expected_value, (list, tuple)):
                 self.assertItemsEqual(actual[key], expected_value)
             else:
                 self.assertEqual(actual[key], expected_value)
 
+    def _assertProtoBytesEqual(self, expected, actual):
+        """Like `assertProtoEquals`, but cheaper when the protos match.
+
+        Compares deterministic serializations first, and only falls back
+        to `assertProtoEquals` (for its readable diff) on a mismatch.
+        `expected` may also be given as deterministically serialized
+        bytes, in which case it is only parsed on a mismatch.
+        """
+        if isinstance(expected, bytes):
+            expected_bytes = expected
+        else:
+            expected_bytes = expected.SerializeToString(deterministic=True)
+        actual_bytes = actual.SerializeToString(deterministic=True)
+        if expected_bytes != actual_bytes:
+            if isinstance(expected, bytes):
+                expected = type(actual).FromString(expected)
+            self.assertProtoEquals(expected, actual)
+
 
 class MockingEventAccumulatorTest(EventAccumulatorTest):
-    def setUp(self):
-        super().setUp()
-        self.stubs = tf.compat.v1.test.StubOutForTesting()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Patch once for the whole class; `_make_accumulator` points the
+        # mock at each test's generator.
+        cls._generator_patcher = mock.patch.object(
+            ea, "_GeneratorFromPath", autospec=True
+        )
+        cls._generator_patcher.start()
 
-    def tearDown(self):
-        super().tearDown()
-        self.stubs.CleanUp()
+    @classmethod
+    def tearDownClass(cls):
+        cls._generator_patcher.stop()
+        super().tearDownClass()
 
     def _make_accumulator(self, generator, **kwargs):
-        patcher = mock.patch.object(ea, "_GeneratorFromPath", autospec=True)
-        mock_impl = patcher.start()
-        mock_impl.return_value = generator
-        self.addCleanup(patcher.stop)
+        # Go through the module: an autospecced function mock stored on the
+        # class would be bound as a method when read off `self`.
+        ea._GeneratorFromPath.return_value = generator
         return ea.EventAccumulator("path/is/ignored", **kwargs)
 
     def testEmptyAccumulator(self):
@@ -207,7 +402,9 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         discard events based on the step value of SessionLog.START.
         """
         warnings = []
-        self.stubs.Set(logger, "warning", warnings.append)
+        patcher = mock.patch.object(logger, "warning", warnings.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
         gen = _EventGenerator(self)
         acc = self._make_accumulator(gen)
@@ -220,15 +417,17 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         gen.AddScalarTensor("s1", wall_time=1, step=300, value=20)
         acc.Reload()
         ## Check that number of items are what they should be
-        self.assertEqual([x.step for x in acc.Tensors("s1")], [100, 200, 300])
+        np.testing.assert_array_equal(
+            _steps(acc.Tensors("s1")), [100, 200, 300]
+        )
 
         gen.AddScalarTensor("s1", wall_time=1, step=101, value=20)
         gen.AddScalarTensor("s1", wall_time=1, step=201, value=20)
         gen.AddScalarTensor("s1", wall_time=1, step=301, value=20)
         acc.Reload()
         ## Check that we have discarded 200 and 300 from s1
-        self.assertEqual(
-            [x.step for x in acc.Tensors("s1")], [100, 101, 201, 301]
+        np.testing.assert_array_equal(
+            _steps(acc.Tensors("s1")), [100, 101, 201, 301]
         )
 
     def testOrphanedDataNotDiscardedIfFlagUnset(self):
@@ -245,15 +444,17 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         gen.AddScalarTensor("s1", wall_time=1, step=300, value=20)
         acc.Reload()
         ## Check that number of items are what they should be
-        self.assertEqual([x.step for x in acc.Tensors("s1")], [100, 200, 300])
+        np.testing.assert_array_equal(
+            _steps(acc.Tensors("s1")), [100, 200, 300]
+        )
 
         gen.AddScalarTensor("s1", wall_time=1, step=101, value=20)
         gen.AddScalarTensor("s1", wall_time=1, step=201, value=20)
         gen.AddScalarTensor("s1", wall_time=1, step=301, value=20)
         acc.Reload()
         ## Check that we have NOT discarded 200 and 300 from s1
-        self.assertEqual(
-            [x.step for x in acc.Tensors("s1")], [100, 200, 300, 101, 201, 301]
+        np.testing.assert_array_equal(
+            _steps(acc.Tensors("s1")), [100, 200, 300, 101, 201, 301]
         )
 
     def testEventsDiscardedPerTagAfterRestartForFileVersionLessThan2(self):
@@ -268,7 +469,9 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         discard events based on the step value of SessionLog.START.
         """
         warnings = []
-        self.stubs.Set(logger, "warning", warnings.append)
+        patcher = mock.patch.object(logger, "warning", warnings.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
         gen = _EventGenerator(self)
         acc = self._make_accumulator(gen)
@@ -289,15 +492,17 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
 
         acc.Reload()
         ## Check that we have discarded 200 and 300 for s1
-        self.assertEqual(
-            [x.step for x in acc.Tensors("s1")], [100, 101, 201, 301]
+        np.testing.assert_array_equal(
+            _steps(acc.Tensors("s1")), [100, 101, 201, 301]
         )
 
         ## Check that s1 discards do not affect s2 (written before out-of-order)
         ## or s3 (written after out-of-order).
         ## i.e. check that only events from the out of order tag are discarded
-        self.assertEqual([x.step for x in acc.Tensors("s2")], [101, 201, 301])
-        self.assertEqual([x.step for x in acc.Tensors("s3")], [101])
+        np.testing.assert_array_equal(
+            _steps(acc.Tensors("s2")), [101, 201, 301]
+        )
+        np.testing.assert_array_equal(_steps(acc.Tensors("s3")), [101])
 
     def testOnlySummaryEventsTriggerDiscards(self):
         """Test that file version event does not trigger data purge."""
@@ -310,7 +515,7 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         gen.AddEvent(ev1)
         gen.AddEvent(ev2)
         acc.Reload()
-        self.assertEqual([x.step for x in acc.Tensors("s1")], [100])
+        np.testing.assert_array_equal(_steps(acc.Tensors("s1")), [100])
 
     def testSessionLogStartMessageDiscardsExpiredEvents(self):
         """Test that SessionLog.START message discards expired events.
@@ -320,16 +525,16 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         which have the SessionLog enum, which was introduced to
         event.proto for file_version >= brain.Event:2.
         """
+        Event = event_pb2.Event
+        SessionLog = event_pb2.SessionLog
         gen = _EventGenerator(self)
         acc = self._make_accumulator(gen)
-        slog = event_pb2.SessionLog(status=event_pb2.SessionLog.START)
+        slog = SessionLog(status=SessionLog.START)
 
-        gen.AddEvent(
-            event_pb2.Event(wall_time=0, step=1, file_version="brain.Event:2")
-        )
+        gen.AddEvent(Event(wall_time=0, step=1, file_version="brain.Event:2"))
 
         gen.AddScalarTensor("s1", wall_time=1, step=100, value=20)
-        gen.AddEvent(event_pb2.Event(wall_time=1, step=100, session_log=slog))
+        gen.AddEvent(Event(wall_time=1, step=100, session_log=slog))
         gen.AddScalarTensor("s1", wall_time=1, step=200, value=20)
         gen.AddScalarTensor("s1", wall_time=1, step=300, value=20)
         gen.AddScalarTensor("s1", wall_time=1, step=400, value=20)
@@ -337,10 +542,10 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         gen.AddScalarTensor("s2", wall_time=1, step=202, value=20)
         gen.AddScalarTensor("s2", wall_time=1, step=203, value=20)
 
-        gen.AddEvent(event_pb2.Event(wall_time=2, step=201, session_log=slog))
+        gen.AddEvent(Event(wall_time=2, step=201, session_log=slog))
         acc.Reload()
-        self.assertEqual([x.step for x in acc.Tensors("s1")], [100, 200])
-        self.assertEqual([x.step for x in acc.Tensors("s2")], [])
+        np.testing.assert_array_equal(_steps(acc.Tensors("s1")), [100, 200])
+        np.testing.assert_array_equal(_steps(acc.Tensors("s2")), [])
 
     def testFirstEventTimestamp(self):
         """Test that FirstEventTimestamp() returns wall_time of the first
@@ -366,7 +571,9 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         def _Die(*args, **kwargs):  # pylint: disable=unused-argument
             raise RuntimeError("Load() should not be called")
 
-        self.stubs.Set(gen, "Load", _Die)
+        patcher = mock.patch.object(gen, "Load", _Die)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.assertEqual(acc.FirstEventTimestamp(), 1)
 
     def testFirstEventTimestampLoadsEvent(self):
@@ -414,7 +621,9 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
         def _Die(*args, **kwargs):  # pylint: disable=unused-argument
             raise RuntimeError("Load() should not be called")
 
-        self.stubs.Set(gen, "Load", _Die)
+        patcher = mock.patch.object(gen, "Load", _Die)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.assertEqual(acc.GetSourceWriter(), "custom_writer")
 
     def testGetSourceWriterLoadsEvent(self):
@@ -437,9 +646,8 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
 
     def testNewStyleScalarSummary(self):
         """Verify processing of tensorboard.plugins.scalar.summary."""
-        event_sink = _EventGenerator(self, zero_out_timestamps=True)
-        writer = test_util.FileWriter(self.get_temp_dir())
-        writer.event_writer = event_sink
+        event_sink = _EventGenerator(self)
+        writer = test_util.FileWriter(event_writer=event_sink)
         with tf.compat.v1.Graph().as_default():
             with self.test_session() as sess:
                 step = tf.compat.v1.placeholder(tf.float32, shape=[])
@@ -448,10 +656,14 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
                 )
                 scalar_summary.op("xent", 1.0 / (step + tf.constant(1.0)))
                 merged = tf.compat.v1.summary.merge_all()
-                writer.add_graph(sess.graph)
-                for i in range(10):
-                    summ = sess.run(merged, feed_dict={step: float(i)})
-                    writer.add_summary(summ, global_step=i)
+                summs = [
+                    sess.run(merged, feed_dict={step: float(i)})
+                    for i in range(10)
+                ]
+                with _zero_wall_time():
+                    writer.add_graph(sess.graph)
+                    for i, summ in enumerate(summs):
+                        writer.add_summary(summ, global_step=i)
 
         accumulator = self._make_accumulator(event_sink)
         accumulator.Reload()
@@ -477,9 +689,8 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
 
     def testNewStyleAudioSummary(self):
         """Verify processing of tensorboard.plugins.audio.summary."""
-        event_sink = _EventGenerator(self, zero_out_timestamps=True)
-        writer = test_util.FileWriter(self.get_temp_dir())
-        writer.event_writer = event_sink
+        event_sink = _EventGenerator(self)
+        writer = test_util.FileWriter(event_writer=event_sink)
         with tf.compat.v1.Graph().as_default():
             with self.test_session() as sess:
                 ipt = tf.random.normal(shape=[5, 441, 2])
@@ -496,10 +707,13 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
                         "three", ipt, sample_rate=44100, max_outputs=3
                     )
                 merged = tf.compat.v1.summary.merge_all()
-                writer.add_graph(sess.graph)
-                for i in range(10):
-                    summ = sess.run(merged)
-                    writer.add_summary(summ, global_step=i)
+                # Only the tags are checked, so one run's output can be
+                # reused for every step.
+                summ = sess.run(merged)
+                with _zero_wall_time():
+                    writer.add_graph(sess.graph)
+                    for i in range(10):
+                        writer.add_summary(summ, global_step=i)
 
         accumulator = self._make_accumulator(event_sink)
         accumulator.Reload()
@@ -526,9 +740,8 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
 
     def testNewStyleImageSummary(self):
         """Verify processing of tensorboard.plugins.image.summary."""
-        event_sink = _EventGenerator(self, zero_out_timestamps=True)
-        writer = test_util.FileWriter(self.get_temp_dir())
-        writer.event_writer = event_sink
+        event_sink = _EventGenerator(self)
+        writer = test_util.FileWriter(event_writer=event_sink)
         with tf.compat.v1.Graph().as_default():
             with self.test_session() as sess:
                 ipt = tf.ones([10, 4, 4, 3], tf.uint8)
@@ -543,10 +756,13 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
                 with tf.name_scope("3"):
                     image_summary.op("images", ipt, max_outputs=3)
                 merged = tf.compat.v1.summary.merge_all()
-                writer.add_graph(sess.graph)
-                for i in range(10):
-                    summ = sess.run(merged)
-                    writer.add_summary(summ, global_step=i)
+                # Only the tags are checked, so one run's output can be
+                # reused for every step.
+                summ = sess.run(merged)
+                with _zero_wall_time():
+                    writer.add_graph(sess.graph)
+                    for i in range(10):
+                        writer.add_summary(summ, global_step=i)
 
         accumulator = self._make_accumulator(event_sink)
         accumulator.Reload()
@@ -573,9 +789,8 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
 
     def testTFSummaryTensor(self):
         """Verify processing of tf.summary.tensor."""
-        event_sink = _EventGenerator(self, zero_out_timestamps=True)
-        writer = test_util.FileWriter(self.get_temp_dir())
-        writer.event_writer = event_sink
+        event_sink = _EventGenerator(self)
+        writer = test_util.FileWriter(event_writer=event_sink)
         with tf.compat.v1.Graph().as_default():
             with self.test_session() as sess:
                 tensor_summary = tf.compat.v1.summary.tensor_summary
@@ -584,7 +799,8 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
                 tensor_summary("string", tf.constant(b"foobar"))
                 merged = tf.compat.v1.summary.merge_all()
                 summ = sess.run(merged)
-                writer.add_summary(summ, 0)
+                with _zero_wall_time():
+                    writer.add_summary(summ, 0)
 
         accumulator = self._make_accumulator(event_sink)
         accumulator.Reload()
@@ -612,9 +828,8 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
     def _testTFSummaryTensor_SizeGuidance(
         self, plugin_name, tensor_size_guidance, steps, expected_count
     ):
-        event_sink = _EventGenerator(self, zero_out_timestamps=True)
-        writer = test_util.FileWriter(self.get_temp_dir())
-        writer.event_writer = event_sink
+        event_sink = _EventGenerator(self)
+        writer = test_util.FileWriter(event_writer=event_sink)
         with tf.compat.v1.Graph().as_default():
             with self.test_session() as sess:
                 summary_metadata = summary_pb2.SummaryMetadata(
@@ -628,8 +843,11 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
                     summary_metadata=summary_metadata,
                 )
                 merged = tf.compat.v1.summary.merge_all()
-                for step in range(steps):
-                    writer.add_summary(sess.run(merged), global_step=step)
+                # The summary is constant, so serialize it only once.
+                summ = sess.run(merged)
+                with _zero_wall_time():
+                    for step in range(steps):
+                        writer.add_summary(summ, global_step=step)
 
         accumulator = self._make_accumulator(
             event_sink, tensor_size_guidance=tensor_size_guidance
@@ -685,42 +903,73 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
 
 
 class RealisticEventAccumulatorTest(EventAccumulatorTest):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Resolve the test temp dir once per class; each test still gets a
+        # fresh subdirectory from `_make_logdir`.
+        cls._make_class_temp_dir()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._remove_class_temp_dir()
+        super().tearDownClass()
+
+    def _make_logdir(self, prefix):
+        return tempfile.mkdtemp(prefix=prefix, dir=self._class_temp_dir)
+
     def testTensorsRealistically(self):
         """Test accumulator by writing values and then reading them."""
 
-        def FakeScalarSummary(tag, value):
-            value = summary_pb2.Summary.Value(tag=tag, simple_value=value)
-            summary = summary_pb2.Summary(value=[value])
-            return summary
+        def FakeScalarSummary(i):
+            """Returns a summary with both the `id` and `sq` values."""
+            return summary_pb2.Summary(
+                value=[
+                    summary_pb2.Summary.Value(tag="id", simple_value=i),
+                    summary_pb2.Summary.Value(tag="sq", simple_value=i * i),
+                ]
+            )
 
-        directory = os.path.join(self.get_temp_dir(), "values_dir")
-        if tf.io.gfile.isdir(directory):
-            tf.io.gfile.rmtree(directory)
-        tf.io.gfile.mkdir(directory)
+        directory = self._make_logdir("values_")
 
         writer = test_util.FileWriter(directory, max_queue=100)
 
         with tf.Graph().as_default() as graph:
             _ = tf.constant([2.0, 1.0])
-            # Add a graph to the summary writer.
-            writer.add_graph(graph)
             graph_def = graph.as_graph_def(add_shapes=True)
             meta_graph_def = tf.compat.v1.train.export_meta_graph(
                 graph_def=graph_def
             )
-            writer.add_meta_graph(meta_graph_def)
 
         run_metadata = config_pb2.RunMetadata()
         device_stats = run_metadata.step_stats.dev_stats.add()
         device_stats.device = "test device"
-        writer.add_run_metadata(run_metadata, "test run")
+
+        # Write the graph, meta graph, and run metadata as pre-serialized
+        # events, serializing each proto exactly once.
+        graph_bytes = graph_def.SerializeToString()
+        meta_graph_bytes = meta_graph_def.SerializeToString()
+        writer.add_event(
+            event_pb2.Event(wall_time=time.time(), graph_def=graph_bytes)
+        )
+        writer.add_event(
+            event_pb2.Event(
+                wall_time=time.time(), meta_graph_def=meta_graph_bytes
+            )
+        )
+        writer.add_event(
+            event_pb2.Event(
+                wall_time=time.time(),
+                tagged_run_metadata=event_pb2.TaggedRunMetadata(
+                    tag="test run",
+                    run_metadata=run_metadata.SerializeToString(),
+                ),
+            )
+        )
 
         # Write a bunch of events using the writer.
         for i in range(30):
-            summ_id = FakeScalarSummary("id", i)
-            summ_sq = FakeScalarSummary("sq", i * i)
-            writer.add_summary(summ_id, i * 5)
-            writer.add_summary(summ_sq, i * 5)
+            writer.add_summary(FakeScalarSummary(i), i * 5)
         writer.flush()
 
         # Verify that we can load those events properly
@@ -744,199 +993,161 @@ class RealisticEventAccumulatorTest(EventAccumulatorTest):
         sq_events = acc.Tensors("sq")
         self.assertEqual(30, len(id_events))
         self.assertEqual(30, len(sq_events))
-        for i in range(30):
-            self.assertEqual(i * 5, id_events[i].step)
-            self.assertEqual(i * 5, sq_events[i].step)
-            self.assertEqual(
-                i, tensor_util.make_ndarray(id_events[i].tensor_proto).item()
-            )
-            self.assertEqual(
-                i * i,
-                tensor_util.make_ndarray(sq_events[i].tensor_proto).item(),
-            )
+        np.testing.assert_array_equal(_steps(id_events), np.arange(30) * 5)
+        np.testing.assert_array_equal(_steps(sq_events), np.arange(30) * 5)
+        np.testing.assert_array_equal(_float_scalars(id_events), np.arange(30))
+        np.testing.assert_array_equal(
+            _float_scalars(sq_events), np.arange(30) ** 2
+        )
 
         # Write a few more events to test incremental reloading
         for i in range(30, 40):
-            summ_id = FakeScalarSummary("id", i)
-            summ_sq = FakeScalarSummary("sq", i * i)
-            writer.add_summary(summ_id, i * 5)
-            writer.add_summary(summ_sq, i * 5)
+            writer.add_summary(FakeScalarSummary(i), i * 5)
         writer.flush()
 
-        # Verify we can now see all of the data
+        # Verify we can now see all of the data. The first 30 events were
+        # checked above, so only check the ones added by this reload.
         acc.Reload()
         id_events = acc.Tensors("id")
         sq_events = acc.Tensors("sq")
         self.assertEqual(40, len(id_events))
         self.assertEqual(40, len(sq_events))
-        for i in range(40):
-            self.assertEqual(i * 5, id_events[i].step)
-            self.assertEqual(i * 5, sq_events[i].step)
-            self.assertEqual(
-                i, tensor_util.make_ndarray(id_events[i].tensor_proto).item()
-            )
-            self.assertEqual(
-                i * i,
-                tensor_util.make_ndarray(sq_events[i].tensor_proto).item(),
-            )
-
-        expected_graph_def = graph_pb2.GraphDef.FromString(
-            graph.as_graph_def(add_shapes=True).SerializeToString()
+        new_indices = np.arange(30, 40)
+        np.testing.assert_array_equal(_steps(id_events[30:]), new_indices * 5)
+        np.testing.assert_array_equal(_steps(sq_events[30:]), new_indices * 5)
+        np.testing.assert_array_equal(
+            _float_scalars(id_events[30:]), new_indices
         )
-        self.assertProtoEquals(expected_graph_def, acc.Graph())
-        self.assertProtoEquals(
-            expected_graph_def,
-            graph_pb2.GraphDef.FromString(acc.SerializedGraph()),
+        np.testing.assert_array_equal(
+            _float_scalars(sq_events[30:]), new_indices**2
         )
 
+        # The graph was written as raw bytes, so the accumulator must hand
+        # back exactly those; `Graph()` is checked once, for its parse.
+        self.assertEqual(graph_bytes, acc.SerializedGraph())
+        # `graph_def` and `meta_graph_def` are TensorFlow's copies of the
+        # protos, so compare against TensorBoard's by parsing the bytes
+        # that were written.
+        expected_graph_def = graph_pb2.GraphDef.FromString(graph_bytes)
+        self._assertProtoBytesEqual(expected_graph_def, acc.Graph())
+
         expected_meta_graph = meta_graph_pb2.MetaGraphDef.FromString(
-            meta_graph_def.SerializeToString()
+            meta_graph_bytes
         )
-        self.assertProtoEquals(expected_meta_graph, acc.MetaGraph())
+        self._assertProtoBytesEqual(expected_meta_graph, acc.MetaGraph())
 
     def testGraphFromMetaGraphBecomesAvailable(self):
         """Test accumulator by writing values and then reading them."""
 
-        directory = os.path.join(
-            self.get_temp_dir(), "metagraph_test_values_dir"
-        )
-        if tf.io.gfile.isdir(directory):
-            tf.io.gfile.rmtree(directory)
-        tf.io.gfile.mkdir(directory)
-
-        writer = test_util.FileWriter(directory, max_queue=100)
+        directory = self._make_logdir("metagraph_test_values_")
 
         with tf.Graph().as_default() as graph:
             _ = tf.constant([2.0, 1.0])
-            # Add a graph to the summary writer.
-            graph_def = graph.as_graph_def(add_shapes=True)
+            graph_def = graph.as_graph_def()
             meta_graph_def = tf.compat.v1.train.export_meta_graph(
                 graph_def=graph_def
             )
-            writer.add_meta_graph(meta_graph_def)
-            writer.flush()
+            meta_graph_bytes = meta_graph_def.SerializeToString(
+                deterministic=True
+            )
+
+        # Write the events synchronously, as a `FileWriter` would lay them
+        # out, without starting its event-queue thread.
+        path = os.path.join(directory, "events.out.tfevents.0.localhost")
+        with tf.io.TFRecordWriter(path) as writer:
+            for event in (
+                event_pb2.Event(wall_time=0.0, file_version="brain.Event:2"),
+                event_pb2.Event(wall_time=0.0, meta_graph_def=meta_graph_bytes),
+            ):
+                writer.write(event.SerializeToString())
 
         # Verify that we can load those events properly
         acc = ea.EventAccumulator(directory)
         acc.Reload()
-        self.assertTagsEqual(
-            acc.Tags(),
-            {
-                ea.GRAPH: True,
-                ea.META_GRAPH: True,
-            },
-        )
-
-        expected_graph_def = graph_pb2.GraphDef.FromString(
-            graph.as_graph_def(add_shapes=True).SerializeToString()
-        )
-        self.assertProtoEquals(expected_graph_def, acc.Graph())
-        self.assertProtoEquals(
-            expected_graph_def,
-            graph_pb2.GraphDef.FromString(acc.SerializedGraph()),
-        )
-
-        expected_meta_graph = meta_graph_pb2.MetaGraphDef.FromString(
-            meta_graph_def.SerializeToString()
+        tags = acc.Tags()
+        self.assertTagsEqual(tags, {ea.GRAPH: True, ea.META_GRAPH: True})
+
+        # The accumulator re-serializes the graph out of the meta graph, which
+        # need not preserve map order, so parse it once and compare that.
+        self._assertProtoBytesEqual(
+            graph_def,
+            tf.compat.v1.GraphDef.FromString(acc.SerializedGraph()),
         )
-        self.assertProtoEquals(expected_meta_graph, acc.MetaGraph())
 
-    def _writeMetadata(self, logdir, summary_metadata, nonce=""):
-        """Write to disk a summary with the given metadata.
-
-        Arguments:
-          logdir: a string
-          summary_metadata: a `SummaryMetadata` protobuf object
-          nonce: optional; will be added to the end of the event file name
-            to guarantee that multiple calls to this function do not stomp the
-            same file
-        """
-
-        summary = summary_pb2.Summary()
-        summary.value.add(
-            tensor=tensor_util.make_tensor_proto(
-                ["po", "ta", "to"], dtype=tf.string
-            ),
-            tag="you_are_it",
-            metadata=summary_metadata,
-        )
-        writer = test_util.FileWriter(logdir, filename_suffix=nonce)
-        writer.add_summary(summary.SerializeToString())
-        writer.close()
+        self._assertProtoBytesEqual(meta_graph_bytes, acc.MetaGraph())
 
     def testSummaryMetadata(self):
-        logdir = self.get_temp_dir()
-        summary_metadata = summary_pb2.SummaryMetadata(
+        logdir = self._make_logdir("summary_metadata_")
+        summary_metadata = _make_summary_metadata(
             display_name="current tagee",
             summary_description="no",
-            plugin_data=summary_pb2.SummaryMetadata.PluginData(
-                plugin_name="outlet"
-            ),
+            plugin_name="outlet",
         )
-        self._writeMetadata(logdir, summary_metadata)
+        _write_metadata(logdir, summary_metadata)
         acc = ea.EventAccumulator(logdir)
         acc.Reload()
         self.assertProtoEquals(
             summary_metadata, acc.SummaryMetadata("you_are_it")
         )
 
-    def testSummaryMetadata_FirstMetadataWins(self):
-        logdir = self.get_temp_dir()
-        summary_metadata_1 = summary_pb2.SummaryMetadata(
+
+class ConflictingSummaryMetadataTest(EventAccumulatorTest):
+    """Tests for a tag whose `SummaryMetadata` changes between files.
+
+    Every test here only reads from one accumulator, so the event files
+    are written and loaded once for the whole class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.summary_metadata_1 = _make_summary_metadata(
             display_name="current tagee",
             summary_description="no",
-            plugin_data=summary_pb2.SummaryMetadata.PluginData(
-                plugin_name="outlet", content=b"120v"
-            ),
+            plugin_name="outlet",
+            content=b"120v",
         )
-        self._writeMetadata(logdir, summary_metadata_1, nonce="1")
-        acc = ea.EventAccumulator(logdir)
-        acc.Reload()
-        summary_metadata_2 = summary_pb2.SummaryMetadata(
+        summary_metadata_2 = _make_summary_metadata(
             display_name="tagee of the future",
             summary_description="definitely not",
-            plugin_data=summary_pb2.SummaryMetadata.PluginData(
-                plugin_name="plug", content=b"110v"
-            ),
+            plugin_name="plug",
+            content=b"110v",
         )
-        self._writeMetadata(logdir, summary_metadata_2, nonce="2")
-        acc.Reload()
+        cls._make_class_temp_dir()
+        try:
+            _write_metadata_batch(
+                cls._class_temp_dir,
+                [(cls.summary_metadata_1, "1"), (summary_metadata_2, "2")],
+            )
+            # Event files are loaded in name order, and the nonce sorts the
+            # first file ahead of the second, so one reload sees both in
+            # order.
+            cls.acc = ea.EventAccumulator(cls._class_temp_dir)
+            cls.acc.Reload()
+        except BaseException:
+            cls._remove_class_temp_dir()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._remove_class_temp_dir()
+        super().tearDownClass()
 
+    def testSummaryMetadata_FirstMetadataWins(self):
         self.assertProtoEquals(
-            summary_metadata_1, acc.SummaryMetadata("you_are_it")
+            self.summary_metadata_1, self.acc.SummaryMetadata("you_are_it")
         )
 
     def testPluginTagToContent_PluginsCannotJumpOnTheBandwagon(self):
         # If there are multiple `SummaryMetadata` for a given tag, and the
         # set of plugins in the `plugin_data` of second is different from
         # that of the first, then the second set should be ignored.
-        logdir = self.get_temp_dir()
-        summary_metadata_1 = summary_pb2.SummaryMetadata(
-            display_name="current tagee",
-            summary_description="no",
-            plugin_data=summary_pb2.SummaryMetadata.PluginData(
-                plugin_name="outlet", content=b"120v"
-            ),
-        )
-        self._writeMetadata(logdir, summary_metadata_1, nonce="1")
-        acc = ea.EventAccumulator(logdir)
-        acc.Reload()
-        summary_metadata_2 = summary_pb2.SummaryMetadata(
-            display_name="tagee of the future",
-            summary_description="definitely not",
-            plugin_data=summary_pb2.SummaryMetadata.PluginData(
-                plugin_name="plug", content=b"110v"
-            ),
-        )
-        self._writeMetadata(logdir, summary_metadata_2, nonce="2")
-        acc.Reload()
-
         self.assertEqual(
-            acc.PluginTagToContent("outlet"), {"you_are_it": b"120v"}
+            self.acc.PluginTagToContent("outlet"), {"you_are_it": b"120v"}
         )
         with self.assertRaisesRegex(KeyError, "plug"):
-            acc.PluginTagToContent("plug")
-        self.assertItemsEqual(acc.ActivePlugins(), ["outlet"])
+            self.acc.PluginTagToContent("plug")
+        self.assertItemsEqual(self.acc.ActivePlugins(), ["outlet"])
 
 
 if __name__ == "__main__":
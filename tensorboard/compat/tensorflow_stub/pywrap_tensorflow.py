@@ -17,6 +17,21 @@
 
 import array
 import struct
+import warnings
+
+try:
+    # Without its C extension, `google_crc32c` warns on import that it is
+    # slow; we ignore that backend below anyway, so don't surface it.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        import google_crc32c
+
+    # The package ships a pure-Python fallback of its own, which is no
+    # faster than the table loop below; only use the C implementation,
+    # which picks a hardware (SSE4.2 / ARMv8) CRC32C at runtime.
+    CRC32C_EXT_ENABLED = google_crc32c.implementation == "c"
+except ImportError:
+    CRC32C_EXT_ENABLED = False
 
 from . import errors
 from .io import gfile
@@ -37,7 +52,12 @@ def TF_bfloat16_type():
 
 
 def masked_crc32c(data):
-    x = u32(crc32c(data))
+    if CRC32C_EXT_ENABLED and type(data) == bytes:
+        # Record framing always hands us `bytes`, so skip the generic
+        # `crc32c` -> `crc_update` path and go straight to the extension.
+        x = google_crc32c.value(data)
+    else:
+        x = u32(crc32c(data))
     return u32(((x >> 15) | u32(x << 17)) + 0xA282EAD8)
 
 
@@ -119,6 +139,11 @@ CRC_INIT = 0
 
 _MASK = 0xFFFFFFFF
 
+# TFRecord framing: a little-endian uint64 length and its masked crc32c,
+# then the data and its masked crc32c.
+_HEADER_STRUCT = struct.Struct("<QI")
+_FOOTER_STRUCT = struct.Struct("<I")
+
 
 def crc_update(crc, data):
     """Update CRC-32C checksum with data.
@@ -130,6 +155,11 @@ def crc_update(crc, data):
       32-bit updated CRC-32C as long.
     """
 
+    if CRC32C_EXT_ENABLED:
+        if type(data) != bytes:
+            data = bytes(array.array("B", data))
+        return google_crc32c.extend(crc, data)
+
     if type(data) != array.array or data.itemsize != 1:
         buf = array.array("B", data)
     else:
@@ -204,42 +234,39 @@ class PyRecordReader_New:
         self._buffer_pos = 0
         # Read the header
         self.curr_event = None
-        header_str = self._read(8)
-        if not header_str:
+        # The 8-byte length and its 4-byte crc32 are read together, as are
+        # the Event string and its trailing crc32, to halve the number of
+        # buffered reads and `struct` calls per record.
+        header_and_crc = self._read(12)
+        if not header_and_crc:
             # Hit EOF so raise and exit
             raise errors.OutOfRangeError(None, None, "No more events to read")
-        if len(header_str) < 8:
+        if len(header_and_crc) < 8:
             raise self._truncation_error("header")
-        header = struct.unpack("<Q", header_str)
-
-        # Read the crc32, which is 4 bytes, and check it against
-        # the crc32 of the header
-        crc_header_str = self._read(4)
-        if len(crc_header_str) < 4:
+        if len(header_and_crc) < 12:
             raise self._truncation_error("header crc")
-        crc_header = struct.unpack("<I", crc_header_str)
-        header_crc_calc = masked_crc32c(header_str)
-        if header_crc_calc != crc_header[0]:
+        header_len, crc_header = _HEADER_STRUCT.unpack(header_and_crc)
+
+        # Check the crc32 against the crc32 of the header
+        header_crc_calc = masked_crc32c(header_and_crc[:8])
+        if header_crc_calc != crc_header:
             raise errors.DataLossError(
                 None, None, "{} failed header crc32 check".format(self.filename)
             )
 
         # The length of the header tells us how many bytes the Event
-        # string takes
-        header_len = int(header[0])
-        event_str = self._read(header_len)
-        if len(event_str) < header_len:
+        # string takes; the next 4 bytes after it contain the crc32 of the
+        # Event string, which we check for integrity.
+        event_and_crc = self._read(header_len + 4)
+        if len(event_and_crc) < header_len:
             raise self._truncation_error("data")
+        if len(event_and_crc) < header_len + 4:
+            raise self._truncation_error("data crc")
+        event_str = event_and_crc[:header_len]
+        (crc_event,) = _FOOTER_STRUCT.unpack_from(event_and_crc, header_len)
 
         event_crc_calc = masked_crc32c(event_str)
-
-        # The next 4 bytes contain the crc32 of the Event string,
-        # which we check for integrity.
-        crc_event_str = self._read(4)
-        if len(crc_event_str) < 4:
-            raise self._truncation_error("data crc")
-        crc_event = struct.unpack("<I", crc_event_str)
-        if event_crc_calc != crc_event[0]:
+        if event_crc_calc != crc_event:
             raise errors.DataLossError(
                 None,
                 None,
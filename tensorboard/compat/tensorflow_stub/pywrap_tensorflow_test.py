@@ -0,0 +1,92 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the CRC-32C helpers in the TensorFlow stub."""
+
+
+import array
+import importlib
+import os
+import sys
+import tempfile
+import warnings
+from unittest import mock
+
+from tensorboard import test as tb_test
+from tensorboard.compat.tensorflow_stub import pywrap_tensorflow
+
+
+class Crc32cTest(tb_test.TestCase):
+    def _check(self):
+        # Check values from RFC 3720, section B.4.
+        self.assertEqual(pywrap_tensorflow.crc32c(b""), 0)
+        self.assertEqual(pywrap_tensorflow.crc32c(b"\x00" * 32), 0x8A9136AA)
+        self.assertEqual(pywrap_tensorflow.crc32c(b"\xff" * 32), 0x62A8AB43)
+        self.assertEqual(pywrap_tensorflow.crc32c(bytes(range(32))), 0x46DD794E)
+        self.assertEqual(
+            pywrap_tensorflow.crc32c(array.array("B", range(32))), 0x46DD794E
+        )
+        self.assertEqual(pywrap_tensorflow.crc32c(b"123456789"), 0xE3069283)
+        partial = pywrap_tensorflow.crc_update(
+            pywrap_tensorflow.CRC_INIT, b"1234"
+        )
+        self.assertEqual(
+            pywrap_tensorflow.crc_update(partial, b"56789"),
+            pywrap_tensorflow.crc32c(b"123456789"),
+        )
+        self.assertEqual(
+            pywrap_tensorflow.masked_crc32c(b"\x00" * 8), 0x07980329
+        )
+        self.assertEqual(
+            pywrap_tensorflow.masked_crc32c(array.array("B", [0] * 8)),
+            0x07980329,
+        )
+
+    def test_default_implementation(self):
+        self._check()
+
+    def test_pure_python_implementation(self):
+        with mock.patch.object(pywrap_tensorflow, "CRC32C_EXT_ENABLED", False):
+            self._check()
+
+
+class Crc32cImportTest(tb_test.TestCase):
+    def test_pure_python_google_crc32c_is_unused_and_quiet(self):
+        # Mimic an install of `google_crc32c` without its C extension,
+        # whose `__init__` warns that it will be slow.
+        package_dir = os.path.join(
+            tempfile.mkdtemp(dir=self.get_temp_dir()), "google_crc32c"
+        )
+        os.mkdir(package_dir)
+        with open(os.path.join(package_dir, "__init__.py"), "w") as f:
+            f.write(
+                "import warnings\n"
+                'warnings.warn("slow", RuntimeWarning)\n'
+                'implementation = "python"\n'
+            )
+        # Reload again afterward so other tests see the real package.
+        self.addCleanup(importlib.reload, pywrap_tensorflow)
+        with mock.patch.object(
+            sys, "path", [os.path.dirname(package_dir)] + sys.path
+        ), mock.patch.dict(sys.modules):
+            sys.modules.pop("google_crc32c", None)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                importlib.reload(pywrap_tensorflow)
+        self.assertFalse(pywrap_tensorflow.CRC32C_EXT_ENABLED)
+        self.assertEqual(caught, [])
+
+
+if __name__ == "__main__":
+    tb_test.main()
@@ -65,6 +65,23 @@ def migrate_event(event, initial_metadata):
     return (event,)
 
 
+def migrate_events(events, initial_metadata):
+    """Migrate a stream of events, as by `migrate_event` on each.
+
+    Args:
+      events: An iterable of `event_pb2.Event`s, consumed lazily. The
+        caller transfers ownership of each event, as for
+        `migrate_event`.
+      initial_metadata: Map from tag name to `SummaryMetadata`, shared
+        across the whole stream as for `migrate_event`.
+
+    Yields:
+      The migrated `event_pb2.Event`s, in order.
+    """
+    for event in events:
+        yield from migrate_event(event, initial_metadata)
+
+
 def _migrate_graph_event(old_event):
     result = event_pb2.Event()
     result.wall_time = old_event.wall_time
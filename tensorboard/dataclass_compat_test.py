@@ -405,5 +405,60 @@ class MigrateEventTest(tf.test.TestCase):
                 self.assertEqual(new_value.metadata.plugin_data.content, b"1")
 
 
+class MigrateEventsTest(tf.test.TestCase):
+    """Tests for `migrate_events`."""
+
+    def test_flattens_and_preserves_order(self):
+        file_version_event = event_pb2.Event(file_version="brain.Event:2")
+        graph_event = event_pb2.Event(
+            step=1, graph_def=graph_pb2.GraphDef().SerializeToString()
+        )
+        scalar_event = event_pb2.Event(step=2)
+        scalar_event.summary.ParseFromString(
+            scalar_summary.pb("foo", 0.125).SerializeToString()
+        )
+
+        new_events = list(
+            dataclass_compat.migrate_events(
+                iter([file_version_event, graph_event, scalar_event]), {}
+            )
+        )
+        # The graph event is kept alongside its migrated form.
+        self.assertLen(new_events, 4)
+        self.assertIs(new_events[0], file_version_event)
+        self.assertIs(new_events[1], graph_event)
+        self.assertEqual(
+            new_events[2].summary.value[0].tag,
+            graphs_metadata.RUN_GRAPH_NAME,
+        )
+        self.assertEqual(new_events[3].step, 2)
+        self.assertEqual(
+            new_events[3].summary.value[0].metadata.data_class,
+            summary_pb2.DATA_CLASS_SCALAR,
+        )
+
+    def test_shares_initial_metadata_across_stream(self):
+        old_events = []
+        for step in range(3):
+            e = event_pb2.Event(step=step)
+            summary = scalar_summary.pb("foo", 0.125)
+            if step > 0:
+                for v in summary.value:
+                    v.ClearField("metadata")
+            e.summary.ParseFromString(summary.SerializeToString())
+            old_events.append(e)
+
+        initial_metadata = {}
+        new_events = list(
+            dataclass_compat.migrate_events(old_events, initial_metadata)
+        )
+        self.assertLen(new_events, 3)
+        self.assertLen(initial_metadata, 1)
+        self.assertEqual(
+            [e.summary.value[0].HasField("metadata") for e in new_events],
+            [True, False, False],
+        )
+
+
 if __name__ == "__main__":
     tf.test.main()
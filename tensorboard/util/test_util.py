@@ -41,12 +41,61 @@ class FileWriter(tf.compat.v1.summary.FileWriter):
     (writing out event files and use the real event readers).
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, event_writer=None, **kwargs):
+        """Creates a test FileWriter.
+
+        Args:
+          *args: Positional arguments for `tf.compat.v1.summary.FileWriter`.
+          event_writer: Optional in-memory sink with an `add_event` method
+            (and `get_logdir`, if plugin assets are written). If given,
+            events are handed straight to it and no event file is created;
+            `flush`, `close` and `reopen` then never touch the sink. It may
+            not be combined with any other argument.
+          **kwargs: Keyword arguments for `tf.compat.v1.summary.FileWriter`.
+
+        Raises:
+          TypeError: If `event_writer` is given along with other arguments.
+        """
+        if event_writer is not None:
+            if args or kwargs:
+                raise TypeError(
+                    "event_writer cannot be combined with other FileWriter "
+                    "arguments, got args=%r, kwargs=%r" % (args, kwargs)
+                )
+            # Skip `tf.compat.v1.summary.FileWriter.__init__`, which would
+            # open an event file (and start its writer thread) only for it
+            # to go unused, and initialize its `SummaryToEventTransformer`
+            # base directly.
+            super(tf.compat.v1.summary.FileWriter, self).__init__(event_writer)
+            # Normally set by the skipped `__init__`; the `add_*` methods
+            # read it via `_warn_if_event_writer_is_closed`.
+            self._closed = False
+            self._has_event_sink = True
+            return
+        self._has_event_sink = False
         # Briefly enter graph mode context so this testing FileWriter can be
         # created from an eager mode context without triggering a usage error.
         with tf.compat.v1.Graph().as_default():
             super().__init__(*args, **kwargs)
 
+    def flush(self):
+        if self._has_event_sink:
+            # Events already went straight to the sink; nothing to flush.
+            return
+        super().flush()
+
+    def close(self):
+        if self._has_event_sink:
+            self._closed = True
+            return
+        super().close()
+
+    def reopen(self):
+        if self._has_event_sink:
+            self._closed = False
+            return
+        super().reopen()
+
     def add_test_summary(self, tag, simple_value=1.0, step=None):
         """Convenience for writing a simple summary for a given tag."""
         value = summary_pb2.Summary.Value(tag=tag, simple_value=simple_value)
@@ -0,0 +1,70 @@
+# Copyright 2022 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the test-only `FileWriter` helper."""
+
+
+import tensorflow as tf
+
+from tensorboard.util import test_util
+
+
+class _EventSink:
+    """Minimal `event_writer` sink: only `add_event` and `get_logdir`."""
+
+    def __init__(self):
+        self.events = []
+
+    def add_event(self, event):
+        self.events.append(event)
+
+    def get_logdir(self):
+        return "sink/has/no/logdir"
+
+
+class FileWriterEventSinkTest(tf.test.TestCase):
+    def test_event_writer_rejects_other_arguments(self):
+        sink = _EventSink()
+        with self.assertRaises(TypeError):
+            test_util.FileWriter(self.get_temp_dir(), event_writer=sink)
+        with self.assertRaises(TypeError):
+            test_util.FileWriter(event_writer=sink, max_queue=1)
+
+    def test_events_go_to_sink(self):
+        sink = _EventSink()
+        writer = test_util.FileWriter(event_writer=sink)
+        writer.add_test_summary("foo", simple_value=2.0, step=3)
+        self.assertLen(sink.events, 1)
+        self.assertEqual(sink.events[0].step, 3)
+        self.assertEqual(sink.events[0].summary.value[0].tag, "foo")
+
+    def test_flush_close_and_reopen_do_not_touch_sink(self):
+        sink = _EventSink()
+        writer = test_util.FileWriter(event_writer=sink)
+        writer.flush()
+        writer.close()
+        writer.reopen()
+        writer.add_test_summary("foo")
+        self.assertLen(sink.events, 1)
+
+    def test_context_manager_closes(self):
+        sink = _EventSink()
+        with test_util.FileWriter(event_writer=sink) as writer:
+            writer.add_test_summary("foo")
+        self.assertTrue(writer._closed)
+        self.assertLen(sink.events, 1)
+
+
+if __name__ == "__main__":
+    tf.test.main()